@@ -4,12 +4,50 @@ merge_ttls.py
 
 Merge TTL files for validation.
 Simpler than oak-curriculum-ontology version (no external imports to resolve).
+
+By default files are merged textually: the @prefix declarations are
+collected into one header and the file bodies are concatenated, so no
+triples are parsed or re-serialized. Use --strict to parse every file with
+rdflib instead; the parsed triples are written as N-Triples unless
+--format turtle is given.
 """
 
+import argparse
+import hashlib
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from rdflib import Graph, URIRef
+import rdflib
+from rdflib import Graph
+from rdflib.namespace import OWL
+
+# Use oxigraph's native Turtle/N-Triples parsers when oxrdflib is installed
+# (pip install oxrdflib); fall back to rdflib's pure-Python plugins otherwise.
+# Triples stay in rdflib's memory store: the "Oxigraph" store rewrites
+# derived datatypes such as xsd:positiveInteger to xsd:integer, which would
+# change what SHACL sees.
+try:
+    import oxrdflib  # noqa: F401 - registers the "ox-*" parsers/serializers
+    TURTLE_FORMAT = "ox-turtle"
+    NT_FORMAT = "ox-nt"
+except ImportError:
+    TURTLE_FORMAT = "turtle"
+    NT_FORMAT = "nt"
 
 OUTPUT_FILE = "/tmp/combined-data.ttl"
+NT_OUTPUT_FILE = "/tmp/combined-data.nt"
+
+# Parsed files are cached as N-Triples, keyed by path, content and parser.
+# Each checkout gets its own directory, since each --strict run prunes the
+# entries it did not use.
+CACHE_DIR = Path(tempfile.gettempdir()) / "oak-ttl-cache-{}".format(
+    hashlib.blake2b(
+        str(Path(__file__).resolve().parent.parent).encode("utf-8"),
+        digest_size=8,
+    ).hexdigest()
+)
 
 # Entry points - will auto-discover all .ttl files
 ROOT_DIRS = [
@@ -17,11 +55,254 @@ ROOT_DIRS = [
     "data"
 ]
 
-# OWL imports predicate
-OWL_IMPORTS = URIRef("http://www.w3.org/2002/07/owl#imports")
+# owl:imports statements (prefixed or full predicate) and their objects,
+# either full IRIs or prefixed names. Imports only appear in ontology
+# headers, so a byte-level scan of each file finds them without building a
+# graph; files the scan cannot fully account for are parsed instead.
+IMPORTS_PREDICATE_RE = re.compile(rb"owl:imports|<http://www\.w3\.org/2002/07/owl#imports>")
+IMPORTS_RE = re.compile(
+    rb"(?:owl:imports|<http://www\.w3\.org/2002/07/owl#imports>)\s+"
+    rb"((?:(?:<[^>]*>|[\w.-]*:[\w.-]*)\s*,\s*)*(?:<[^>]*>|[\w.-]*:[\w.-]*))"
+)
+IMPORT_OBJECT_RE = re.compile(rb"<([^>]*)>|([\w.-]*):([\w.-]*)")
+
+# Turtle prefix directives, in both @prefix and SPARQL-style PREFIX form
+PREFIX_RE = re.compile(
+    rb"^[ \t]*(?:@prefix[ \t]+([\w.-]*):[ \t]*<([^>]*)>[ \t]*\.|PREFIX[ \t]+([\w.-]*):[ \t]*<([^>]*)>)[ \t]*\r?$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# Lines that start a prefix directive; any PREFIX_RE does not match (trailing
+# comments, several directives on a line, a directive split across lines)
+# would go untracked in the merged header
+DIRECTIVE_RE = re.compile(rb"^[ \t]*(?:@prefix\b|PREFIX\s)", re.IGNORECASE | re.MULTILINE)
+
+# Constructs that cannot be safely concatenated across files
+BASE_RE = re.compile(rb"^[ \t]*(?:@base|BASE)[ \t]", re.IGNORECASE | re.MULTILINE)
+BNODE_LABEL_RE = re.compile(rb"_:[A-Za-z0-9]")
+# IRIs without a scheme resolve against the document they appear in
+RELATIVE_IRI_RE = re.compile(rb"<(?![A-Za-z][A-Za-z0-9+.-]*:)[^>\s]*>")
+
+
+def iter_ttl_files(root, repo_root):
+    """
+    Yield the paths of .ttl files under root.
+    versions/ directories are pruned rather than walked and filtered.
+    """
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name == "versions":
+                        print(f"⏭  Skipping versioned directory: {Path(entry.path).relative_to(repo_root)}")
+                    else:
+                        stack.append(entry.path)
+                elif entry.name.endswith(".ttl"):
+                    yield entry.path
+
+
+def cache_file_for(path, data):
+    """Return the CACHE_DIR entry holding the parsed N-Triples of a TTL file."""
+    key = hashlib.blake2b(digest_size=16)
+    key.update(f"{path}\0{TURTLE_FORMAT}\0{rdflib.__version__}\0raw-literals\0".encode("utf-8"))
+    key.update(data)
+    return CACHE_DIR / f"{key.hexdigest()}.nt"
+
+
+def prune_cache(keep):
+    """
+    Delete cache entries other than those in keep, so entries for old
+    versions of edited files do not pile up. Temporary files being written
+    by concurrent runs are left alone.
+    """
+    if not CACHE_DIR.is_dir():
+        return
+    for entry in CACHE_DIR.glob("*.nt"):
+        if entry not in keep:
+            entry.unlink(missing_ok=True)
+
+
+def parse_ttl(path):
+    """
+    Parse a single TTL file in a worker process.
+    Returns the triples as N-Triples bytes, which are cheap to pickle and
+    much faster to re-parse than Turtle. Results are cached in CACHE_DIR so
+    unchanged files are not re-parsed on the next run.
+    """
+    data = Path(path).read_bytes()
+    cache_file = cache_file_for(path, data)
+    try:
+        return cache_file.read_bytes()
+    except OSError:
+        # Not cached yet, or pruned by a concurrent run
+        pass
+
+    # Skip rdflib's literal canonicalisation while parsing: it costs a
+    # datatype conversion per typed literal, and validation re-parses the
+    # output (and normalises) anyway
+    normalize_literals = rdflib.NORMALIZE_LITERALS
+    rdflib.NORMALIZE_LITERALS = False
+    try:
+        g = Graph()
+        g.parse(data=data, format=TURTLE_FORMAT, publicID=Path(path).absolute().as_uri())
+        nt = g.serialize(format=NT_FORMAT, encoding="utf-8")
+    finally:
+        rdflib.NORMALIZE_LITERALS = normalize_literals
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+    tmp_file.write_bytes(nt)
+    os.replace(tmp_file, cache_file)
+    return nt
+
+
+def parse_files(ttl_files):
+    """
+    Parse TTL files in parallel worker processes.
+    Yields the N-Triples for each file, in order.
+    """
+    with ProcessPoolExecutor() as executor:
+        results = executor.map(parse_ttl, [str(f) for f in ttl_files])
+        for ttl_file in ttl_files:
+            try:
+                yield next(results)
+            except Exception as e:
+                print(f"❌ Error parsing {ttl_file}: {e}")
+                raise
+
+
+def prefix_match(match):
+    """Return (prefix, namespace) from a PREFIX_RE match."""
+    if match.group(1) is not None:
+        return match.group(1, 2)
+    return match.group(3, 4)
+
+
+def split_prefixes(data):
+    """
+    Split Turtle source into its leading prefix declarations and the rest.
+    Returns ({prefix: namespace}, body).
+    """
+    prefixes = {}
+    lines = data.splitlines(keepends=True)
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if not stripped or stripped.startswith(b"#"):
+            continue
+        match = PREFIX_RE.match(line)
+        if not match:
+            return prefixes, b"".join(lines[i:])
+        prefix, namespace = prefix_match(match)
+        prefixes[prefix] = namespace
+    return prefixes, b""
 
 
-def check_imports(g, repo_root):
+def unmergeable_reason(data):
+    """
+    Return why Turtle source cannot be merged textually, or None if it can.
+    """
+    if BASE_RE.search(data):
+        return "uses @base"
+    if BNODE_LABEL_RE.search(data):
+        return "uses labelled blank nodes"
+    if RELATIVE_IRI_RE.search(data):
+        return "uses relative IRIs"
+    if len(DIRECTIVE_RE.findall(data)) != len(PREFIX_RE.findall(data)):
+        return "has a prefix directive that is not on a line of its own"
+    return None
+
+
+def merge_text(sources, repo_root, output_file):
+    """
+    Merge TTL files by concatenating their bodies under one prefix header.
+    Returns False (writing nothing) if a file uses @base, labelled blank
+    nodes or relative IRIs, which would change meaning once files share a
+    document, or declares a prefix in a form the merge cannot track.
+    """
+    header = {}
+    bodies = []
+
+    for ttl_file, data in sources:
+        print(f"📄 Merging: {ttl_file.relative_to(repo_root)}")
+        reason = unmergeable_reason(data)
+        if reason:
+            print(f"⚠️  {ttl_file.relative_to(repo_root)} {reason}")
+            return False
+
+        prefixes, body = split_prefixes(data)
+        for prefix, namespace in prefixes.items():
+            header.setdefault(prefix, namespace)
+        bodies.append((ttl_file, prefixes, body))
+
+    with open(output_file, "wb") as out:
+        for prefix, namespace in header.items():
+            out.write(b"@prefix %s: <%s> .\n" % (prefix, namespace))
+
+        bound = dict(header)
+        for ttl_file, prefixes, body in bodies:
+            # Re-declare any prefix this file binds differently from the
+            # current binding; Turtle allows prefixes to be redefined
+            rebind = {p: ns for p, ns in prefixes.items() if bound.get(p) != ns}
+            if rebind:
+                print(f"⚠️  Prefix conflict in {ttl_file.relative_to(repo_root)}: "
+                      f"{', '.join(p.decode() + ':' for p in rebind)} redeclared")
+            out.write(b"\n")
+            for prefix, namespace in rebind.items():
+                out.write(b"@prefix %s: <%s> .\n" % (prefix, namespace))
+            bound.update(rebind)
+
+            out.write(body)
+            if not body.endswith(b"\n"):
+                out.write(b"\n")
+
+            # Prefixes declared mid-file stay in effect for following files
+            for match in PREFIX_RE.finditer(body):
+                prefix, namespace = prefix_match(match)
+                bound[prefix] = namespace
+
+    return True
+
+
+def scan_imports(data):
+    """
+    Return the IRIs declared with owl:imports in Turtle source, expanding
+    prefixed names through the file's prefix declarations.
+    Returns None if the scan cannot account for every import.
+    """
+    matches = IMPORTS_RE.findall(data)
+    if len(matches) != len(IMPORTS_PREDICATE_RE.findall(data)):
+        return None
+
+    prefixes = dict(prefix_match(match) for match in PREFIX_RE.finditer(data))
+    imports = []
+    for objects in matches:
+        for iri, prefix, local in IMPORT_OBJECT_RE.findall(objects):
+            if iri:
+                imports.append(iri)
+            elif prefix in prefixes:
+                # A local name cannot end with "."; that is the statement end
+                imports.append(prefixes[prefix] + local.rstrip(b"."))
+            else:
+                return None
+    return [iri.decode("utf-8") for iri in imports]
+
+
+def find_imports(path, data):
+    """
+    Return the IRIs declared with owl:imports in Turtle source, parsing the
+    file with rdflib if a byte-level scan cannot read them.
+    """
+    imports = scan_imports(data)
+    if imports is None:
+        g = Graph()
+        g.parse(data=data, format=TURTLE_FORMAT, publicID=Path(path).absolute().as_uri())
+        imports = [str(o) for o in g.objects(None, OWL.imports)]
+    return imports
+
+
+def check_imports(sources, repo_root):
     """
     Check that all owl:imports declarations are resolvable.
     Warns about external imports that might not be available.
@@ -29,15 +310,14 @@ def check_imports(g, repo_root):
     external_imports = []
     local_imports = []
 
-    for s, p, o in g.triples((None, OWL_IMPORTS, None)):
-        import_uri = str(o)
-
-        # Check if it's a local w3id.org import
-        if "w3id.org/uk/curriculum" in import_uri:
-            local_imports.append(import_uri)
-        elif not import_uri.startswith("http://www.w3.org/"):
-            # Skip standard W3C vocabularies (OWL, RDFS, SKOS, etc.)
-            external_imports.append(import_uri)
+    for ttl_file, data in sources:
+        for import_uri in find_imports(ttl_file, data):
+            # Check if it's a local w3id.org import
+            if "w3id.org/uk/curriculum" in import_uri:
+                local_imports.append(import_uri)
+            elif not import_uri.startswith("http://www.w3.org/"):
+                # Skip standard W3C vocabularies (OWL, RDFS, SKOS, etc.)
+                external_imports.append(import_uri)
 
     if local_imports:
         print("\n📋 Local curriculum imports found:")
@@ -51,10 +331,29 @@ def check_imports(g, repo_root):
         print("   These should resolve via w3id.org or be standard vocabularies.")
 
 
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Merge TTL files for validation")
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="Parse every file with rdflib and serialize the merged graph "
+             "(slower, but reports parse errors per file)"
+    )
+    parser.add_argument(
+        "--format",
+        choices=["turtle", "nt"],
+        help=f"Output format: turtle writes {OUTPUT_FILE}, nt writes "
+             f"{NT_OUTPUT_FILE} and implies --strict "
+             "(default: turtle, or nt with --strict)"
+    )
+    return parser.parse_args()
+
+
 def main():
+    args = parse_arguments()
     repo_root = Path(__file__).parent.parent
-    g = Graph()
-    files_processed = []
+    ttl_files = []
 
     print("=" * 70)
     print("MERGING TTL FILES FOR VALIDATION")
@@ -67,27 +366,43 @@ def main():
             continue
 
         # Find all .ttl files, excluding versions/
-        for ttl_file in sorted(dir_path.rglob("*.ttl")):
-            if "versions" in ttl_file.parts:
-                print(f"⏭  Skipping versioned file: {ttl_file.relative_to(repo_root)}")
-                continue
+        ttl_files.extend(sorted(Path(p) for p in iter_ttl_files(dir_path, repo_root)))
 
+    sources = [(ttl_file, ttl_file.read_bytes()) for ttl_file in ttl_files]
+
+    strict = args.strict or args.format == "nt"
+    output_format = args.format or ("nt" if strict else "turtle")
+    if not strict and not merge_text(sources, repo_root, OUTPUT_FILE):
+        print("   Falling back to --strict merge")
+        strict = True
+
+    if strict:
+        for ttl_file in ttl_files:
             print(f"📄 Parsing: {ttl_file.relative_to(repo_root)}")
-            try:
-                g.parse(str(ttl_file), format="turtle")
-                files_processed.append(ttl_file)
-            except Exception as e:
-                print(f"❌ Error parsing {ttl_file}: {e}")
-                raise
 
-    # Check owl:imports declarations
-    check_imports(g, repo_root)
+        if output_format == "nt":
+            # Worker output is already N-Triples, so just concatenate it
+            output_file = NT_OUTPUT_FILE
+            with open(output_file, "wb") as out:
+                for nt in parse_files(ttl_files):
+                    out.write(nt)
+        else:
+            # Serialize merged graph (one parse per file keeps blank nodes apart)
+            output_file = OUTPUT_FILE
+            g = Graph()
+            for nt in parse_files(ttl_files):
+                g.parse(data=nt, format=NT_FORMAT)
+            g.serialize(destination=output_file, format=TURTLE_FORMAT)
 
-    # Serialize merged graph
-    g.serialize(destination=OUTPUT_FILE, format="turtle")
+        prune_cache({cache_file_for(str(ttl_file), data) for ttl_file, data in sources})
+    else:
+        output_file = OUTPUT_FILE
+
+    # Check owl:imports declarations
+    check_imports(sources, repo_root)
 
     print("\n" + "=" * 70)
-    print(f"✅ Successfully merged {len(files_processed)} files into {OUTPUT_FILE}")
+    print(f"✅ Successfully merged {len(ttl_files)} files into {output_file}")
     print("=" * 70)
 
 
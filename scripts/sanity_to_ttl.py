@@ -6,7 +6,9 @@ Converts curriculum data from Sanity CMS JSON format to RDF Turtle (.ttl) files
 that conform to the DfE Curriculum Ontology.
 
 Usage:
-    python scripts/sanity_to_ttl.py [--api | --sample] [--subjects SUBJECTS] [--incremental]
+    python scripts/sanity_to_ttl.py [--api | --sample] [--subjects SUBJECTS] [--incremental] [--legacy]
+                                      [--format {turtle,nt,jelly}] [--single-file]
+                                      [--jobs N]
 
 Options:
     --api          Fetch data from Sanity API (requires credentials)
@@ -14,6 +16,14 @@ Options:
     --subjects     Comma-separated list of subjects to update (e.g., 'science,history')
                    Use 'all' to update everything (default: all)
     --incremental  Only fetch documents changed since last run (requires --api)
+    --legacy       Build rdflib Graphs and write them with rdflib's Turtle serializer
+                   instead of streaming Turtle directly
+    --format       turtle (default) writes .ttl files; nt also writes an N-Triples
+                   (.nt) file alongside each one; jelly also writes a binary
+                   Jelly (.jelly) file alongside each one (requires pyjelly)
+    --single-file  Write each subject as one {subject}.ttl instead of three files
+                   (files in the other layout from earlier runs are removed)
+    --jobs         Number of subjects to convert in parallel (default: number of CPUs)
 
 Examples:
     # Test with sample data
@@ -27,22 +37,136 @@ Examples:
 
     # Incremental update (only changed documents)
     python scripts/sanity_to_ttl.py --api --incremental
+
+    # Also write N-Triples files for downstream tooling
+    python scripts/sanity_to_ttl.py --sample --format nt
 """
 
-import json
 import os
+import re
 import sys
 import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager, nullcontext, suppress
+from functools import lru_cache
+from itertools import repeat
 from datetime import datetime, timezone
-from typing import Dict, List, Any, Optional
-from rdflib import Graph, Namespace, Literal, URIRef
-from rdflib.namespace import RDF, RDFS, OWL, SKOS, DCTERMS, XSD
+from typing import Dict, Iterator, List, Any, Optional, Protocol, Set, Tuple
+from rdflib import Graph, Namespace, Literal, URIRef, plugin
+from rdflib.namespace import RDF, RDFS, OWL, SKOS, DCTERMS, XSD, NamespaceManager
+from rdflib.plugins.stores.memory import SimpleMemory
+from rdflib.serializer import Serializer
+
+# Use orjson to decode JSON when it is installed (pip install orjson); it
+# builds the same dicts and lists as the json module, only faster.
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
 # Namespaces
 CURRIC = Namespace("https://w3id.org/uk/curriculum/core/")
 ENG = Namespace("https://w3id.org/uk/curriculum/england/")
 DC = Namespace("http://purl.org/dc/elements/1.1/")
 
+# Concept schemes
+KNOWLEDGE_TAXONOMY = ENG['knowledge-taxonomy']
+THEMES_SCHEME = ENG['themes-scheme']
+
+# Core classes and properties used by the converters (resolved once rather
+# than through Namespace attribute lookup for every triple)
+CURRIC_PHASE = CURRIC.Phase
+CURRIC_KEY_STAGE = CURRIC.KeyStage
+CURRIC_DISCIPLINE = CURRIC.Discipline
+CURRIC_SUBJECT = CURRIC.Subject
+CURRIC_STRAND = CURRIC.Strand
+CURRIC_SUB_STRAND = CURRIC.SubStrand
+CURRIC_CONTENT_DESCRIPTOR = CURRIC.ContentDescriptor
+CURRIC_CONTENT_SUB_DESCRIPTOR = CURRIC.ContentSubDescriptor
+CURRIC_SUB_SUBJECT = CURRIC.SubSubject
+CURRIC_SCHEME = CURRIC.Scheme
+CURRIC_THEME = CURRIC.Theme
+
+CURRIC_LOWER_AGE_BOUNDARY = CURRIC.lowerAgeBoundary
+CURRIC_UPPER_AGE_BOUNDARY = CURRIC.upperAgeBoundary
+CURRIC_IS_PART_OF = CURRIC.isPartOf
+CURRIC_HAS_DISCIPLINE = CURRIC.hasDiscipline
+CURRIC_HAS_STRAND = CURRIC.hasStrand
+CURRIC_HAS_AIM = CURRIC.hasAim
+CURRIC_HAS_KEY_STAGE = CURRIC.hasKeyStage
+CURRIC_HAS_CONTENT_DESCRIPTOR = CURRIC.hasContentDescriptor
+CURRIC_EXAMPLE = CURRIC.example
+CURRIC_EXAMPLE_URL = CURRIC.exampleURL
+
+RDFS_LABEL = RDFS.label
+RDFS_COMMENT = RDFS.comment
+SKOS_PREF_LABEL = SKOS.prefLabel
+SKOS_DEFINITION = SKOS.definition
+SKOS_SCOPE_NOTE = SKOS.scopeNote
+SKOS_BROADER = SKOS.broader
+DCTERMS_DESCRIPTION = DCTERMS.description
+DCTERMS_SOURCE = DCTERMS.source
+XSD_NON_NEGATIVE_INTEGER = XSD.nonNegativeInteger
+XSD_POSITIVE_INTEGER = XSD.positiveInteger
+XSD_ANY_URI = XSD.anyURI
+
+# Predicate/object pairs that are the same for every document of a type
+IS_CONCEPT = (RDF.type, SKOS.Concept)
+IS_PHASE = (RDF.type, CURRIC_PHASE)
+IS_KEY_STAGE = (RDF.type, CURRIC_KEY_STAGE)
+IS_DISCIPLINE = (RDF.type, CURRIC_DISCIPLINE)
+IS_SUBJECT = (RDF.type, CURRIC_SUBJECT)
+IS_STRAND = (RDF.type, CURRIC_STRAND)
+IS_SUB_STRAND = (RDF.type, CURRIC_SUB_STRAND)
+IS_CONTENT_DESCRIPTOR = (RDF.type, CURRIC_CONTENT_DESCRIPTOR)
+IS_CONTENT_SUB_DESCRIPTOR = (RDF.type, CURRIC_CONTENT_SUB_DESCRIPTOR)
+IS_SUB_SUBJECT = (RDF.type, CURRIC_SUB_SUBJECT)
+IS_SCHEME = (RDF.type, CURRIC_SCHEME)
+IS_THEME = (RDF.type, CURRIC_THEME)
+TOP_CONCEPT_OF_KNOWLEDGE_TAXONOMY = (SKOS.topConceptOf, KNOWLEDGE_TAXONOMY)
+IN_KNOWLEDGE_TAXONOMY = (SKOS.inScheme, KNOWLEDGE_TAXONOMY)
+IN_THEMES_SCHEME = (SKOS.inScheme, THEMES_SCHEME)
+
+# Prefixes bound in every output file
+PREFIXES = {
+    "curric": CURRIC,
+    "eng": ENG,
+    "rdf": RDF,
+    "rdfs": RDFS,
+    "owl": OWL,
+    "skos": SKOS,
+    "dc": DC,
+    "dcterms": DCTERMS,
+    "xsd": XSD,
+}
+
+# Characters that must be escaped inside a "..." Turtle string
+TURTLE_ESCAPES = str.maketrans({'\\': '\\\\', '"': '\\"', '\n': '\\n', '\r': '\\r'})
+
+# Local names that can be written as prefix:local without escaping
+PN_LOCAL_RE = re.compile(r'[A-Za-z0-9_](?:[A-Za-z0-9_.-]*[A-Za-z0-9_-])?')
+
+# Subject names that can appear in document IDs (e.g. "scheme-mathematics-ks3")
+# and the subject each one stands for. Matching is case-sensitive, and the
+# lookahead lets findall() report names that overlap, as in "mathscience".
+SUBJECT_ID_NAMES = {
+    'science': 'science', 'history': 'history', 'mathematics': 'mathematics',
+    'maths': 'mathematics', 'english': 'english', 'geography': 'geography',
+}
+SUBJECT_ID_RE = re.compile('(?=(' + '|'.join(SUBJECT_ID_NAMES) + '))')
+
+# Single-valued reference fields resolved by preprocess()
+REFERENCE_FIELDS = (
+    'phase', 'keyStage', 'discipline', 'strand', 'substrand',
+    'contentDescriptor', 'subject', 'subsubject',
+)
+
+# Namespace manager shared by every graph from create_graph
+SHARED_NAMESPACE_MANAGER: Optional[NamespaceManager] = None
+
+# Document ID -> URI, filled in by get_uri_from_id
+URI_CACHE: Dict[str, URIRef] = {}
+
 # Output paths
 OUTPUT_DIR = "data/national-curriculum-for-england"
 SUBJECTS_DIR = f"{OUTPUT_DIR}/subjects"
@@ -109,21 +233,28 @@ def load_sample_data():
     if not os.path.exists(sample_file):
         raise FileNotFoundError(f"Sample data file not found: {sample_file}")
 
-    with open(sample_file, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    with open(sample_file, 'rb') as f:
+        return json_loads(f.read())
 
 
 def get_uri_from_id(doc_id: str) -> URIRef:
     """Convert Sanity document ID to RDF URI."""
-    # Remove 'drafts.' prefix if present
-    doc_id = doc_id.replace('drafts.', '')
-    return ENG[doc_id]
+    uri = URI_CACHE.get(doc_id)
+    if uri is None:
+        # Remove 'drafts.' prefix if present
+        slug = doc_id[7:] if doc_id.startswith('drafts.') else doc_id
+        uri = URI_CACHE[doc_id] = ENG[slug]
+    return uri
 
 
 def get_slug(doc: Dict) -> str:
     """Extract slug from Sanity document."""
-    if 'id' in doc and isinstance(doc['id'], dict):
-        return doc['id'].get('current', '')
+    slug = doc.get('_slug')
+    if slug is not None:
+        return slug
+    slug_field = doc.get('id')
+    if isinstance(slug_field, dict):
+        return slug_field.get('current', '')
     return doc.get('_id', '').replace('drafts.', '')
 
 
@@ -135,279 +266,558 @@ def resolve_reference(ref: Any, data_store: Dict) -> URIRef:
     return None
 
 
+def subjects_in_id(doc_id: str) -> Set[str]:
+    """Return the subjects named in a document ID, per SUBJECT_ID_NAMES."""
+    return {SUBJECT_ID_NAMES[name] for name in SUBJECT_ID_RE.findall(doc_id)}
+
+
+def ref_slug(ref: Any) -> Optional[str]:
+    """Return the slug a Sanity reference points at, without building a URI."""
+    ref_id = ref.get('_ref') if isinstance(ref, dict) else None
+    if ref_id and ref_id.startswith('drafts.'):
+        return ref_id[7:]
+    return ref_id
+
+
+@lru_cache(maxsize=100_000)
+def literal_en(value: str) -> Literal:
+    """Return an English language-tagged Literal, reused for repeated values."""
+    return Literal(value, lang="en")
+
+
+@lru_cache(maxsize=100_000, typed=True)
+def typed_literal(value: Any, datatype: URIRef) -> Literal:
+    """Return a typed Literal, reused for repeated values."""
+    return Literal(value, datatype=datatype)
+
+
+def preprocess(data: Dict):
+    """
+    Compute each document's slug and referenced slugs once, up front.
+
+    Sets doc['_slug'] (returned by get_slug from then on) and
+    doc['_refs'] = {field: slug} for the single-valued reference fields in
+    REFERENCE_FIELDS, so subject discovery and filtering compare plain
+    strings instead of rebuilding URIs. Safe to call more than once.
+    """
+    for docs in data.values():
+        if not isinstance(docs, list):
+            continue
+        for doc in docs:
+            if '_slug' in doc:
+                continue
+            refs = {}
+            for field in REFERENCE_FIELDS:
+                if field in doc:
+                    slug = ref_slug(doc[field])
+                    if slug:
+                        refs[field] = slug
+            doc['_refs'] = refs
+            doc['_slug'] = get_slug(doc)
+
+
 def create_graph() -> Graph:
-    """Create and configure RDF graph with namespaces."""
-    g = Graph()
-    g.bind("curric", CURRIC)
-    g.bind("eng", ENG)
-    g.bind("rdf", RDF)
-    g.bind("rdfs", RDFS)
-    g.bind("owl", OWL)
-    g.bind("skos", SKOS)
-    g.bind("dc", DC)
-    g.bind("dcterms", DCTERMS)
-    g.bind("xsd", XSD)
+    """
+    Create and configure RDF graph with namespaces.
+
+    The graph only ever has triples added and then serialized, so it uses
+    rdflib's SimpleMemory store rather than the default Memory store, which
+    also keeps the extra indexes and context bookkeeping needed for queries.
+    The prefixes are bound once, on an empty template graph, and every
+    graph shares its namespace manager.
+    """
+    global SHARED_NAMESPACE_MANAGER
+
+    if SHARED_NAMESPACE_MANAGER is None:
+        template = Graph(store=SimpleMemory())
+        for prefix, namespace in PREFIXES.items():
+            template.bind(prefix, namespace)
+        SHARED_NAMESPACE_MANAGER = template.namespace_manager
+
+    g = Graph(store=SimpleMemory())
+    g.namespace_manager = SHARED_NAMESPACE_MANAGER
     return g
 
 
-def add_ontology_header(g: Graph, uri: str, title: str, description: str, version: str = "0.1.0"):
-    """Add ontology metadata to graph."""
-    ontology_uri = URIRef(uri)
+def lit_en(value: str) -> str:
+    """Render an English language-tagged Turtle literal."""
+    return '"' + value.translate(TURTLE_ESCAPES) + '"@en'
+
+
+def lit_typed(value: Any, datatype: str) -> str:
+    """Render a Turtle literal with a datatype given as a prefixed name."""
+    return '"' + str(value).translate(TURTLE_ESCAPES) + '"^^' + datatype
+
 
-    g.add((ontology_uri, RDF.type, OWL.Ontology))
-    g.add((ontology_uri, RDFS.label, Literal(title, lang="en")))
-    g.add((ontology_uri, DC.title, Literal(title, lang="en")))
-    g.add((ontology_uri, RDFS.comment, Literal(description, lang="en")))
-    g.add((ontology_uri, OWL.versionInfo, Literal(version)))
-    g.add((ontology_uri, DCTERMS.creator, Literal("Department for Education")))
-    g.add((ontology_uri, DCTERMS.created, Literal(datetime.now().strftime("%Y-%m-%d"), datatype=XSD.date)))
-    g.add((ontology_uri, DCTERMS.license, URIRef("http://www.nationalarchives.gov.uk/doc/open-government-licence/version/3/")))
-    g.add((ontology_uri, DCTERMS.rights, Literal("Crown Copyright", lang="en")))
-    g.add((ontology_uri, OWL.imports, URIRef(CURRIC)))
+class TripleWriter(Protocol):
+    """Where the converters send triples: the Turtle, N-Triples, Graph and Tee writers."""
 
+    def emit(self, subject: URIRef, po_pairs: List[Tuple[URIRef, Any]]):
+        """Write one subject with its predicate/object pairs."""
+        ...
+
+
+class TurtleWriter:
+    """
+    Stream Turtle to an open file handle, one subject block at a time.
+
+    Terms are rendered directly from the rdflib terms the converters build,
+    so no Graph is populated and nothing is held in memory beyond the block
+    being written.
+    """
+
+    def __init__(self, fh, prefixes: Dict[str, Namespace] = PREFIXES):
+        self.fh = fh
+        self.prefixes = {prefix: str(namespace) for prefix, namespace in prefixes.items()}
+        self.names: Dict[URIRef, str] = {}
+        fh.write(''.join(f"@prefix {prefix}: <{namespace}> .\n"
+                         for prefix, namespace in self.prefixes.items()) + "\n")
+
+    def name(self, uri: URIRef) -> str:
+        """Return the prefixed name for a URI, or <uri> if it has none."""
+        name = self.names.get(uri)
+        if name is None:
+            name = f"<{uri}>"
+            for prefix, namespace in self.prefixes.items():
+                if uri.startswith(namespace) and PN_LOCAL_RE.fullmatch(uri[len(namespace):]):
+                    name = f"{prefix}:{uri[len(namespace):]}"
+                    break
+            self.names[uri] = name
+        return name
+
+    def term(self, term) -> str:
+        """Render a URIRef or Literal as Turtle."""
+        if not isinstance(term, Literal):
+            return self.name(term)
+        if term.language == 'en':
+            return lit_en(term)
+        if term.datatype is not None:
+            return lit_typed(term, self.name(term.datatype))
+        text = '"' + term.translate(TURTLE_ESCAPES) + '"'
+        return f"{text}@{term.language}" if term.language else text
+
+    def emit(self, subject: URIRef, po_pairs: List[Tuple[URIRef, Any]]):
+        """Write one subject with its predicate/object pairs."""
+        term = self.term
+        body = ' ;\n    '.join(f"{term(p)} {term(o)}" for p, o in po_pairs)
+        self.fh.write(f"{self.name(subject)}\n    {body} .\n\n")
+
+
+class NTriplesWriter:
+    """Stream N-Triples to an open file handle, one line per triple."""
+
+    def __init__(self, fh):
+        self.fh = fh
+
+    @staticmethod
+    def term(term) -> str:
+        """Render a URIRef or Literal as N-Triples."""
+        if not isinstance(term, Literal):
+            return f"<{term}>"
+        text = '"' + term.translate(TURTLE_ESCAPES) + '"'
+        if term.language:
+            return f"{text}@{term.language}"
+        if term.datatype is not None:
+            return f"{text}^^<{term.datatype}>"
+        return text
+
+    def emit(self, subject: URIRef, po_pairs: List[Tuple[URIRef, Any]]):
+        """Write one line for each of the subject's predicate/object pairs."""
+        term = self.term
+        s = f"<{subject}> "
+        self.fh.writelines(f"{s}<{p}> {term(o)} .\n" for p, o in po_pairs)
+
+
+class GraphWriter:
+    """Collect emitted triples into an rdflib Graph (used by --legacy and jelly output)."""
+
+    def __init__(self, g: Graph):
+        self.graph = g
+
+    def emit(self, subject: URIRef, po_pairs: List[Tuple[URIRef, Any]]):
+        """Add one subject with its predicate/object pairs to the graph."""
+        g = self.graph
+        g.addN((subject, p, o, g) for p, o in po_pairs)
+
+
+class TeeWriter:
+    """Pass every emitted subject on to several writers."""
+
+    def __init__(self, *writers):
+        self.writers = writers
+
+    def emit(self, subject: URIRef, po_pairs: List[Tuple[URIRef, Any]]):
+        """Write one subject to each writer."""
+        for writer in self.writers:
+            writer.emit(subject, po_pairs)
+
+
+@contextmanager
+def open_output_file(filepath: str):
+    """
+    Open a text output file for streaming, creating its directory if needed.
 
-def convert_phases(data: List[Dict], g: Graph):
+    Output goes to a temporary file that replaces filepath only once it is
+    complete, so readers never see a partially written file.
+    """
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    tmp_path = f"{filepath}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8', buffering=1 << 20) as fh:
+            yield fh
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        raise
+
+
+@contextmanager
+def open_ttl_file(filepath: str, legacy: bool = False, output_format: str = "turtle",
+                  io_pool: Optional["FileWriterPool"] = None) -> Iterator[TripleWriter]:
+    """
+    Open a TTL output file and yield a writer for it.
+
+    By default Turtle is streamed straight to disk. With legacy=True the
+    triples are collected into a Graph and written with rdflib's serializer;
+    if io_pool is given the file write happens on its background threads.
+    output_format "nt" also streams an N-Triples file next to the TTL file,
+    and "jelly" collects the triples into a Graph and writes it next to the
+    TTL file as Jelly.
+    """
+    stem = os.path.splitext(filepath)[0]
+    g = create_graph() if legacy or output_format == "jelly" else None
+    written = []
+
+    with ExitStack() as stack:
+        writers = []
+        if g is not None:
+            writers.append(GraphWriter(g))
+        if not legacy:
+            writers.append(TurtleWriter(stack.enter_context(open_output_file(filepath))))
+            written.append(filepath)
+        if output_format == "nt":
+            writers.append(NTriplesWriter(stack.enter_context(open_output_file(stem + '.nt'))))
+            written.append(stem + '.nt')
+
+        yield writers[0] if len(writers) == 1 else TeeWriter(*writers)
+
+    for path in written:
+        print(f"✓ Written: {path}")
+
+    if legacy:
+        write_ttl_file(g, filepath, io_pool)
+    if output_format == "jelly":
+        write_jelly_file(g, filepath)
+
+
+def add_ontology_header(writer: TripleWriter, uri: str, title: str, description: str, version: str = "0.1.0"):
+    """Add ontology metadata to the output."""
+    writer.emit(URIRef(uri), [
+        (RDF.type, OWL.Ontology),
+        (RDFS.label, literal_en(title)),
+        (DC.title, literal_en(title)),
+        (RDFS.comment, literal_en(description)),
+        (OWL.versionInfo, Literal(version)),
+        (DCTERMS.creator, Literal("Department for Education")),
+        (DCTERMS.created, typed_literal(datetime.now().strftime("%Y-%m-%d"), XSD.date)),
+        (DCTERMS.license, URIRef("http://www.nationalarchives.gov.uk/doc/open-government-licence/version/3/")),
+        (DCTERMS.rights, literal_en("Crown Copyright")),
+        (OWL.imports, URIRef(CURRIC)),
+    ])
+
+
+def convert_phases(data: List[Dict], writer: TripleWriter):
     """Convert Phase documents to RDF."""
     for doc in data:
         uri = get_uri_from_id(get_slug(doc))
+        po = [IS_PHASE]
+        po.append((RDFS_LABEL, literal_en(doc['label'])))
+        po.append((RDFS_COMMENT, literal_en(doc['description'])))
+        po.append((CURRIC_LOWER_AGE_BOUNDARY, typed_literal(doc['lowerAgeBoundary'], XSD_NON_NEGATIVE_INTEGER)))
+        po.append((CURRIC_UPPER_AGE_BOUNDARY, typed_literal(doc['upperAgeBoundary'], XSD_POSITIVE_INTEGER)))
 
-        g.add((uri, RDF.type, CURRIC.Phase))
-        g.add((uri, RDFS.label, Literal(doc['label'], lang="en")))
-        g.add((uri, RDFS.comment, Literal(doc['description'], lang="en")))
-        g.add((uri, CURRIC.lowerAgeBoundary, Literal(doc['lowerAgeBoundary'], datatype=XSD.nonNegativeInteger)))
-        g.add((uri, CURRIC.upperAgeBoundary, Literal(doc['upperAgeBoundary'], datatype=XSD.positiveInteger)))
+        writer.emit(uri, po)
 
 
-def convert_key_stages(data: List[Dict], g: Graph):
+def convert_key_stages(data: List[Dict], writer: TripleWriter):
     """Convert KeyStage documents to RDF."""
     for doc in data:
         uri = get_uri_from_id(get_slug(doc))
-
-        g.add((uri, RDF.type, CURRIC.KeyStage))
-        g.add((uri, RDFS.label, Literal(doc['label'], lang="en")))
-        g.add((uri, RDFS.comment, Literal(doc['description'], lang="en")))
-        g.add((uri, CURRIC.lowerAgeBoundary, Literal(doc['lowerAgeBoundary'], datatype=XSD.nonNegativeInteger)))
-        g.add((uri, CURRIC.upperAgeBoundary, Literal(doc['upperAgeBoundary'], datatype=XSD.positiveInteger)))
+        po = [IS_KEY_STAGE]
+        po.append((RDFS_LABEL, literal_en(doc['label'])))
+        po.append((RDFS_COMMENT, literal_en(doc['description'])))
+        po.append((CURRIC_LOWER_AGE_BOUNDARY, typed_literal(doc['lowerAgeBoundary'], XSD_NON_NEGATIVE_INTEGER)))
+        po.append((CURRIC_UPPER_AGE_BOUNDARY, typed_literal(doc['upperAgeBoundary'], XSD_POSITIVE_INTEGER)))
 
         # Add phase relationship
-        if 'phase' in doc:
-            phase_uri = resolve_reference(doc['phase'], {})
-            if phase_uri:
-                g.add((uri, CURRIC.isPartOf, phase_uri))
+        phase_uri = resolve_reference(doc.get('phase'), {})
+        if phase_uri:
+            po.append((CURRIC_IS_PART_OF, phase_uri))
+
+        writer.emit(uri, po)
 
 
-def convert_disciplines(data: List[Dict], g: Graph):
+def convert_disciplines(data: List[Dict], writer: TripleWriter):
     """Convert Discipline documents to RDF (SKOS Concepts)."""
     for doc in data:
         uri = get_uri_from_id(get_slug(doc))
+        po = [IS_CONCEPT, IS_DISCIPLINE]
+        po.append((SKOS_PREF_LABEL, literal_en(doc['prefLabel'])))
+        po.append((SKOS_DEFINITION, literal_en(doc['definition'])))
 
-        g.add((uri, RDF.type, SKOS.Concept))
-        g.add((uri, RDF.type, CURRIC.Discipline))
-        g.add((uri, SKOS.prefLabel, Literal(doc['prefLabel'], lang="en")))
-        g.add((uri, SKOS.definition, Literal(doc['definition'], lang="en")))
+        scope_note = doc.get('scopeNote')
+        if scope_note:
+            po.append((SKOS_SCOPE_NOTE, literal_en(scope_note)))
 
-        if 'scopeNote' in doc and doc['scopeNote']:
-            g.add((uri, SKOS.scopeNote, Literal(doc['scopeNote'], lang="en")))
+        po.append(TOP_CONCEPT_OF_KNOWLEDGE_TAXONOMY)
+        po.append(IN_KNOWLEDGE_TAXONOMY)
 
-        g.add((uri, SKOS.topConceptOf, ENG['knowledge-taxonomy']))
-        g.add((uri, SKOS.inScheme, ENG['knowledge-taxonomy']))
+        writer.emit(uri, po)
 
 
-def convert_subjects(data: List[Dict], g: Graph):
+def convert_subjects(data: List[Dict], writer: TripleWriter):
     """Convert Subject documents to RDF."""
     for doc in data:
         uri = get_uri_from_id(get_slug(doc))
-
-        g.add((uri, RDF.type, CURRIC.Subject))
-        g.add((uri, RDFS.label, Literal(doc['label'], lang="en")))
-        g.add((uri, RDFS.comment, Literal(doc['description'], lang="en")))
+        po = [IS_SUBJECT]
+        po.append((RDFS_LABEL, literal_en(doc['label'])))
+        po.append((RDFS_COMMENT, literal_en(doc['description'])))
 
         # Add discipline relationships
-        if 'disciplines' in doc:
-            for disc_ref in doc['disciplines']:
-                disc_uri = resolve_reference(disc_ref, {})
-                if disc_uri:
-                    g.add((uri, CURRIC.hasDiscipline, disc_uri))
+        for disc_ref in doc.get('disciplines') or ():
+            disc_uri = resolve_reference(disc_ref, {})
+            if disc_uri:
+                po.append((CURRIC_HAS_DISCIPLINE, disc_uri))
+
+        writer.emit(uri, po)
 
 
-def convert_strands(data: List[Dict], g: Graph):
+def convert_strands(data: List[Dict], writer: TripleWriter):
     """Convert Strand documents to RDF (SKOS Concepts)."""
     for doc in data:
         uri = get_uri_from_id(get_slug(doc))
+        po = [IS_CONCEPT, IS_STRAND]
+        po.append((SKOS_PREF_LABEL, literal_en(doc['prefLabel'])))
 
-        g.add((uri, RDF.type, SKOS.Concept))
-        g.add((uri, RDF.type, CURRIC.Strand))
-        g.add((uri, SKOS.prefLabel, Literal(doc['prefLabel'], lang="en")))
-
-        if 'definition' in doc and doc['definition']:
-            g.add((uri, SKOS.definition, Literal(doc['definition'], lang="en")))
+        definition = doc.get('definition')
+        if definition:
+            po.append((SKOS_DEFINITION, literal_en(definition)))
 
         # Add discipline relationship
-        if 'discipline' in doc:
-            disc_uri = resolve_reference(doc['discipline'], {})
-            if disc_uri:
-                g.add((uri, SKOS.broader, disc_uri))
+        disc_uri = resolve_reference(doc.get('discipline'), {})
+        if disc_uri:
+            po.append((SKOS_BROADER, disc_uri))
 
-        g.add((uri, SKOS.inScheme, ENG['knowledge-taxonomy']))
+        po.append(IN_KNOWLEDGE_TAXONOMY)
 
+        writer.emit(uri, po)
 
-def convert_substrands(data: List[Dict], g: Graph):
+
+def convert_substrands(data: List[Dict], writer: TripleWriter):
     """Convert SubStrand documents to RDF (SKOS Concepts)."""
     for doc in data:
         uri = get_uri_from_id(get_slug(doc))
+        po = [IS_CONCEPT, IS_SUB_STRAND]
+        po.append((SKOS_PREF_LABEL, literal_en(doc['prefLabel'])))
 
-        g.add((uri, RDF.type, SKOS.Concept))
-        g.add((uri, RDF.type, CURRIC.SubStrand))
-        g.add((uri, SKOS.prefLabel, Literal(doc['prefLabel'], lang="en")))
-
-        if 'definition' in doc and doc['definition']:
-            g.add((uri, SKOS.definition, Literal(doc['definition'], lang="en")))
+        definition = doc.get('definition')
+        if definition:
+            po.append((SKOS_DEFINITION, literal_en(definition)))
 
         # Add strand relationship
-        if 'strand' in doc:
-            strand_uri = resolve_reference(doc['strand'], {})
-            if strand_uri:
-                g.add((uri, SKOS.broader, strand_uri))
+        strand_uri = resolve_reference(doc.get('strand'), {})
+        if strand_uri:
+            po.append((SKOS_BROADER, strand_uri))
 
-        g.add((uri, SKOS.inScheme, ENG['knowledge-taxonomy']))
+        po.append(IN_KNOWLEDGE_TAXONOMY)
 
+        writer.emit(uri, po)
 
-def convert_content_descriptors(data: List[Dict], g: Graph):
+
+def convert_content_descriptors(data: List[Dict], writer: TripleWriter):
     """Convert ContentDescriptor documents to RDF (SKOS Concepts)."""
     for doc in data:
         uri = get_uri_from_id(get_slug(doc))
+        po = [IS_CONCEPT, IS_CONTENT_DESCRIPTOR]
+        po.append((SKOS_PREF_LABEL, literal_en(doc['prefLabel'])))
 
-        g.add((uri, RDF.type, SKOS.Concept))
-        g.add((uri, RDF.type, CURRIC.ContentDescriptor))
-        g.add((uri, SKOS.prefLabel, Literal(doc['prefLabel'], lang="en")))
-
-        if 'definition' in doc and doc['definition']:
-            g.add((uri, SKOS.definition, Literal(doc['definition'], lang="en")))
+        definition = doc.get('definition')
+        if definition:
+            po.append((SKOS_DEFINITION, literal_en(definition)))
 
         # Add substrand relationship
-        if 'substrand' in doc:
-            substrand_uri = resolve_reference(doc['substrand'], {})
-            if substrand_uri:
-                g.add((uri, SKOS.broader, substrand_uri))
+        substrand_uri = resolve_reference(doc.get('substrand'), {})
+        if substrand_uri:
+            po.append((SKOS_BROADER, substrand_uri))
 
-        g.add((uri, SKOS.inScheme, ENG['knowledge-taxonomy']))
+        po.append(IN_KNOWLEDGE_TAXONOMY)
 
+        writer.emit(uri, po)
 
-def convert_content_subdescriptors(data: List[Dict], g: Graph):
+
+def convert_content_subdescriptors(data: List[Dict], writer: TripleWriter):
     """Convert ContentSubDescriptor documents to RDF (SKOS Concepts)."""
     for doc in data:
         uri = get_uri_from_id(get_slug(doc))
+        po = [IS_CONCEPT, IS_CONTENT_SUB_DESCRIPTOR]
+        po.append((SKOS_PREF_LABEL, literal_en(doc['prefLabel'])))
 
-        g.add((uri, RDF.type, SKOS.Concept))
-        g.add((uri, RDF.type, CURRIC.ContentSubDescriptor))
-        g.add((uri, SKOS.prefLabel, Literal(doc['prefLabel'], lang="en")))
-
-        if 'definition' in doc and doc['definition']:
-            g.add((uri, SKOS.definition, Literal(doc['definition'], lang="en")))
+        definition = doc.get('definition')
+        if definition:
+            po.append((SKOS_DEFINITION, literal_en(definition)))
 
         # Add content descriptor relationship
-        if 'contentDescriptor' in doc:
-            cd_uri = resolve_reference(doc['contentDescriptor'], {})
-            if cd_uri:
-                g.add((uri, SKOS.broader, cd_uri))
+        cd_uri = resolve_reference(doc.get('contentDescriptor'), {})
+        if cd_uri:
+            po.append((SKOS_BROADER, cd_uri))
 
         # Add examples
-        if 'exampleText' in doc and doc['exampleText']:
-            g.add((uri, CURRIC.example, Literal(doc['exampleText'], lang="en")))
+        example_text = doc.get('exampleText')
+        if example_text:
+            po.append((CURRIC_EXAMPLE, literal_en(example_text)))
+
+        example_url = doc.get('exampleUrl')
+        if example_url:
+            po.append((CURRIC_EXAMPLE_URL, typed_literal(example_url, XSD_ANY_URI)))
 
-        if 'exampleUrl' in doc and doc['exampleUrl']:
-            g.add((uri, CURRIC.exampleURL, Literal(doc['exampleUrl'], datatype=XSD.anyURI)))
+        po.append(IN_KNOWLEDGE_TAXONOMY)
 
-        g.add((uri, SKOS.inScheme, ENG['knowledge-taxonomy']))
+        writer.emit(uri, po)
 
 
-def convert_subsubjects(data: List[Dict], g: Graph):
+def convert_subsubjects(data: List[Dict], writer: TripleWriter):
     """Convert SubSubject documents to RDF."""
     for doc in data:
         uri = get_uri_from_id(get_slug(doc))
+        po = [IS_SUB_SUBJECT]
+        po.append((RDFS_LABEL, literal_en(doc['label'])))
+        po.append((RDFS_COMMENT, literal_en(doc['description'])))
 
-        g.add((uri, RDF.type, CURRIC.SubSubject))
-        g.add((uri, RDFS.label, Literal(doc['label'], lang="en")))
-        g.add((uri, RDFS.comment, Literal(doc['description'], lang="en")))
-
-        if 'fullDescription' in doc and doc['fullDescription']:
-            g.add((uri, DCTERMS.description, Literal(doc['fullDescription'], lang="en")))
+        full_description = doc.get('fullDescription')
+        if full_description:
+            po.append((DCTERMS_DESCRIPTION, literal_en(full_description)))
 
-        if 'sourceUrl' in doc and doc['sourceUrl']:
-            g.add((uri, DCTERMS.source, URIRef(doc['sourceUrl'])))
+        source_url = doc.get('sourceUrl')
+        if source_url:
+            po.append((DCTERMS_SOURCE, URIRef(source_url)))
 
         # Add subject relationship
-        if 'subject' in doc:
-            subject_uri = resolve_reference(doc['subject'], {})
-            if subject_uri:
-                g.add((uri, CURRIC.isPartOf, subject_uri))
+        subject_uri = resolve_reference(doc.get('subject'), {})
+        if subject_uri:
+            po.append((CURRIC_IS_PART_OF, subject_uri))
 
         # Add strand relationships
-        if 'strands' in doc:
-            for strand_ref in doc['strands']:
-                strand_uri = resolve_reference(strand_ref, {})
-                if strand_uri:
-                    g.add((uri, CURRIC.hasStrand, strand_uri))
+        for strand_ref in doc.get('strands') or ():
+            strand_uri = resolve_reference(strand_ref, {})
+            if strand_uri:
+                po.append((CURRIC_HAS_STRAND, strand_uri))
 
         # Add aims
-        if 'aims' in doc:
-            for aim in doc['aims']:
-                if 'aimText' in aim:
-                    g.add((uri, CURRIC.hasAim, Literal(aim['aimText'], lang="en")))
+        for aim in doc.get('aims') or ():
+            aim_text = aim.get('aimText')
+            if aim_text is not None:
+                po.append((CURRIC_HAS_AIM, literal_en(aim_text)))
+
+        writer.emit(uri, po)
 
 
-def convert_schemes(data: List[Dict], g: Graph):
+def convert_schemes(data: List[Dict], writer: TripleWriter):
     """Convert Scheme documents to RDF."""
     for doc in data:
         uri = get_uri_from_id(get_slug(doc))
-
-        g.add((uri, RDF.type, CURRIC.Scheme))
-        g.add((uri, RDFS.label, Literal(doc['label'], lang="en")))
-        g.add((uri, RDFS.comment, Literal(doc['description'], lang="en")))
+        po = [IS_SCHEME]
+        po.append((RDFS_LABEL, literal_en(doc['label'])))
+        po.append((RDFS_COMMENT, literal_en(doc['description'])))
 
         # Add subsubject relationship
-        if 'subsubject' in doc:
-            subsubject_uri = resolve_reference(doc['subsubject'], {})
-            if subsubject_uri:
-                g.add((uri, CURRIC.isPartOf, subsubject_uri))
+        subsubject_uri = resolve_reference(doc.get('subsubject'), {})
+        if subsubject_uri:
+            po.append((CURRIC_IS_PART_OF, subsubject_uri))
 
         # Add key stage relationship
-        if 'keyStage' in doc:
-            ks_uri = resolve_reference(doc['keyStage'], {})
-            if ks_uri:
-                g.add((uri, CURRIC.hasKeyStage, ks_uri))
+        ks_uri = resolve_reference(doc.get('keyStage'), {})
+        if ks_uri:
+            po.append((CURRIC_HAS_KEY_STAGE, ks_uri))
 
         # Add content descriptor relationships
-        if 'contentDescriptors' in doc:
-            for cd_ref in doc['contentDescriptors']:
-                cd_uri = resolve_reference(cd_ref, {})
-                if cd_uri:
-                    g.add((uri, CURRIC.hasContentDescriptor, cd_uri))
+        for cd_ref in doc.get('contentDescriptors') or ():
+            cd_uri = resolve_reference(cd_ref, {})
+            if cd_uri:
+                po.append((CURRIC_HAS_CONTENT_DESCRIPTOR, cd_uri))
 
+        writer.emit(uri, po)
 
-def convert_themes(data: List[Dict], g: Graph):
+
+def convert_themes(data: List[Dict], writer: TripleWriter):
     """Convert Theme documents to RDF (SKOS Concepts)."""
     for doc in data:
         uri = get_uri_from_id(get_slug(doc))
+        po = [IS_CONCEPT, IS_THEME]
+        po.append((SKOS_PREF_LABEL, literal_en(doc['prefLabel'])))
+        po.append((SKOS_DEFINITION, literal_en(doc['definition'])))
+        po.append(IN_THEMES_SCHEME)
 
-        g.add((uri, RDF.type, SKOS.Concept))
-        g.add((uri, RDF.type, CURRIC.Theme))
-        g.add((uri, SKOS.prefLabel, Literal(doc['prefLabel'], lang="en")))
-        g.add((uri, SKOS.definition, Literal(doc['definition'], lang="en")))
-        g.add((uri, SKOS.inScheme, ENG['themes-scheme']))
+        writer.emit(uri, po)
 
 
-def write_ttl_file(g: Graph, filepath: str):
-    """Write graph to TTL file."""
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+class FileWriterPool:
+    """
+    Write files on background threads so disk I/O overlaps with the
+    serialization of the next file. Waits for every write on exit and
+    re-raises the first error.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.futures = []
+
+    def submit(self, filepath: str, content: str):
+        """Queue content to be written to filepath."""
+        self.futures.append(self.executor.submit(write_text_file, filepath, content))
+
+    def __enter__(self):
+        return self
 
+    def __exit__(self, *exc_info):
+        self.executor.shutdown(wait=True)
+        for future in self.futures:
+            future.result()
+
+
+def write_text_file(filepath: str, content: str):
+    """Write text to a file, creating its directory if needed."""
+    with open_output_file(filepath) as f:
+        f.write(content)
+
+    print(f"✓ Written: {filepath}")
+
+
+def write_ttl_file(g: Graph, filepath: str, io_pool: Optional[FileWriterPool] = None):
+    """Write graph to TTL file, in the background if an io_pool is given."""
     # Serialize to TTL format
     ttl_content = g.serialize(format='turtle')
 
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(ttl_content)
+    if io_pool is None:
+        write_text_file(filepath, ttl_content)
+    else:
+        io_pool.submit(filepath, ttl_content)
 
-    print(f"✓ Written: {filepath}")
+
+def write_jelly_file(g: Graph, filepath: str):
+    """Write graph to a Jelly file next to the given TTL path."""
+    jelly_path = os.path.splitext(filepath)[0] + '.jelly'
+    os.makedirs(os.path.dirname(jelly_path), exist_ok=True)
+    tmp_path = f"{jelly_path}.{os.getpid()}.tmp"
+    try:
+        g.serialize(destination=tmp_path, format='jelly')
+        os.replace(tmp_path, jelly_path)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        raise
+
+    print(f"✓ Written: {jelly_path}")
 
 
 def discover_subjects(data: Dict) -> List[str]:
@@ -415,119 +825,147 @@ def discover_subjects(data: Dict) -> List[str]:
     Discover all subjects present in the data.
     Returns list of subject IDs (e.g., ['science', 'history', 'mathematics'])
     """
-    subjects = set()
+    preprocess(data)
 
-    # Get explicit subjects
-    for subject in data.get('subjects', []):
-        subject_id = get_slug(subject)
-        if subject_id and subject_id.startswith('subject-'):
-            subject_name = subject_id.replace('subject-', '')
-            subjects.add(subject_name)
+    # Explicit subjects, plus any only referenced from subsubjects
+    subjects = {
+        slug.removeprefix('subject-')
+        for slug in map(get_slug, data.get('subjects', []))
+        if slug.startswith('subject-')
+    }
+    subjects.update(
+        subject_ref.removeprefix('subject-')
+        for subsubject in data.get('subsubjects', [])
+        if (subject_ref := subsubject['_refs'].get('subject'))
+    )
 
-    # Also check subsubjects to catch any subjects we might have missed
-    for subsubject in data.get('subsubjects', []):
-        if 'subject' in subsubject:
-            subject_ref = resolve_reference(subsubject['subject'], {})
-            if subject_ref:
-                subject_name = str(subject_ref).split('/')[-1].replace('subject-', '')
-                subjects.add(subject_name)
+    return sorted(subjects)
 
-    return sorted(list(subjects))
 
+def build_indexes(data: Dict) -> Dict[str, Dict[str, List[Dict]]]:
+    """
+    Index documents by their own slug and child documents by the slug of the
+    parent they reference.
 
-def get_subject_data(data: Dict, subject: str) -> Dict:
+    Built once per run so that get_subject_data can follow reference chains
+    with dict lookups instead of rescanning every document list per subject.
+    Runs preprocess() on the data first if main() has not already done so.
+    """
+    preprocess(data)
+
+    def by_parent(key: str, field: str) -> Dict[str, List[Dict]]:
+        index = {}
+        for doc in data.get(key, []):
+            parent = doc['_refs'].get(field)
+            if parent:
+                index.setdefault(parent, []).append(doc)
+        return index
+
+    def by_slug(key: str) -> Dict[str, List[Dict]]:
+        index = {}
+        for doc in data.get(key, []):
+            index.setdefault(get_slug(doc), []).append(doc)
+        return index
+
+    return {
+        'subjects_by_slug': by_slug('subjects'),
+        'disciplines_by_slug': by_slug('disciplines'),
+        'subsubjects_by_subject': by_parent('subsubjects', 'subject'),
+        'strands_by_discipline': by_parent('strands', 'discipline'),
+        'substrands_by_strand': by_parent('substrands', 'strand'),
+        'descriptors_by_substrand': by_parent('contentDescriptors', 'substrand'),
+        'subdescriptors_by_descriptor': by_parent('contentSubdescriptors', 'contentDescriptor'),
+        'schemes_by_subsubject': by_parent('schemes', 'subsubject'),
+    }
+
+
+def get_subject_data(data: Dict, subject: str,
+                     indexes: Optional[Dict[str, Dict[str, List[Dict]]]] = None) -> Dict:
     """
     Filter data to only include documents for the specified subject.
     Follows reference chains to get complete subject data.
+
+    indexes is the result of build_indexes(data); pass it in when calling
+    this for several subjects so the indexes are only built once.
     """
+    if indexes is None:
+        indexes = build_indexes(data)
+
+    def lookup(index: str, ids) -> List[Dict]:
+        docs_by_id = indexes[index]
+        return [doc for i in ids for doc in docs_by_id.get(i, [])]
+
     subject_data = {}
 
     # Filter subjects
-    subject_data['subjects'] = [
-        s for s in data.get('subjects', [])
-        if get_slug(s).replace('subject-', '') == subject
-    ]
+    subject_data['subjects'] = lookup('subjects_by_slug', [f'subject-{subject}', subject])
 
     # Filter subsubjects
-    subject_data['subsubjects'] = [
-        ss for ss in data.get('subsubjects', [])
-        if 'subject' in ss and
-        str(resolve_reference(ss['subject'], {})).endswith(f'subject-{subject}')
-    ]
-
-    # Get discipline IDs used by this subject
-    discipline_ids = set()
+    subject_data['subsubjects'] = lookup('subsubjects_by_subject', [f'subject-{subject}'])
+
+    # Get discipline IDs used by this subject (ordered, without duplicates)
+    discipline_ids = {}
     for subj in subject_data['subjects']:
         for disc_ref in subj.get('disciplines', []):
-            disc_uri = resolve_reference(disc_ref, {})
-            if disc_uri:
-                discipline_ids.add(str(disc_uri).split('/')[-1])
+            disc_slug = ref_slug(disc_ref)
+            if disc_slug:
+                discipline_ids[disc_slug] = None
 
     # Filter disciplines
-    subject_data['disciplines'] = [
-        d for d in data.get('disciplines', [])
-        if get_slug(d) in discipline_ids
-    ]
+    subject_data['disciplines'] = lookup('disciplines_by_slug', discipline_ids)
 
     # Get strands that reference these disciplines
-    strand_ids = set()
-    for strand in data.get('strands', []):
-        if 'discipline' in strand:
-            disc_ref = str(resolve_reference(strand['discipline'], {})).split('/')[-1]
-            if disc_ref in discipline_ids:
-                strand_ids.add(get_slug(strand))
-
-    subject_data['strands'] = [
-        s for s in data.get('strands', [])
-        if get_slug(s) in strand_ids
-    ]
+    subject_data['strands'] = lookup('strands_by_discipline', discipline_ids)
+    strand_ids = dict.fromkeys(get_slug(s) for s in subject_data['strands'])
 
     # Get substrands for these strands
-    substrand_ids = set()
-    for substrand in data.get('substrands', []):
-        if 'strand' in substrand:
-            strand_ref = str(resolve_reference(substrand['strand'], {})).split('/')[-1]
-            if strand_ref in strand_ids:
-                substrand_ids.add(get_slug(substrand))
-
-    subject_data['substrands'] = [
-        ss for ss in data.get('substrands', [])
-        if get_slug(ss) in substrand_ids
-    ]
+    subject_data['substrands'] = lookup('substrands_by_strand', strand_ids)
+    substrand_ids = dict.fromkeys(get_slug(ss) for ss in subject_data['substrands'])
 
     # Get content descriptors for these substrands
-    descriptor_ids = set()
-    for cd in data.get('contentDescriptors', []):
-        if 'substrand' in cd:
-            substrand_ref = str(resolve_reference(cd['substrand'], {})).split('/')[-1]
-            if substrand_ref in substrand_ids:
-                descriptor_ids.add(get_slug(cd))
-
-    subject_data['contentDescriptors'] = [
-        cd for cd in data.get('contentDescriptors', [])
-        if get_slug(cd) in descriptor_ids
-    ]
+    subject_data['contentDescriptors'] = lookup('descriptors_by_substrand', substrand_ids)
+    descriptor_ids = dict.fromkeys(get_slug(cd) for cd in subject_data['contentDescriptors'])
 
     # Get content subdescriptors for these descriptors
-    subject_data['contentSubdescriptors'] = [
-        csd for csd in data.get('contentSubdescriptors', [])
-        if 'contentDescriptor' in csd and
-        str(resolve_reference(csd['contentDescriptor'], {})).split('/')[-1] in descriptor_ids
-    ]
+    subject_data['contentSubdescriptors'] = lookup('subdescriptors_by_descriptor', descriptor_ids)
 
     # Get schemes for this subject's subsubjects
-    subsubject_ids = set(get_slug(ss) for ss in subject_data['subsubjects'])
-    subject_data['schemes'] = [
-        sch for sch in data.get('schemes', [])
-        if 'subsubject' in sch and
-        str(resolve_reference(sch['subsubject'], {})).split('/')[-1] in subsubject_ids
-    ]
+    subsubject_ids = dict.fromkeys(get_slug(ss) for ss in subject_data['subsubjects'])
+    subject_data['schemes'] = lookup('schemes_by_subsubject', subsubject_ids)
 
     return subject_data
 
 
-def generate_subject_files(subject: str, subject_data: Dict):
-    """Generate all TTL files for a subject."""
+# The files written for each subject: file name suffix, title suffix,
+# description, and the (data key, converter) pairs that fill the file
+SUBJECT_FILES = (
+    ("subject", "Subject",
+     "{title} subject definition, including aims and strands.",
+     (('subjects', convert_subjects),
+      ('subsubjects', convert_subsubjects))),
+    ("knowledge-taxonomy", "Knowledge Taxonomy",
+     "{title} knowledge taxonomy from disciplines to content descriptors.",
+     (('disciplines', convert_disciplines),
+      ('strands', convert_strands),
+      ('substrands', convert_substrands),
+      ('contentDescriptors', convert_content_descriptors),
+      ('contentSubdescriptors', convert_content_subdescriptors))),
+    ("schemes", "Schemes",
+     "{title} schemes mapping content to key stages.",
+     (('schemes', convert_schemes),)),
+)
+
+
+def generate_subject_files(subject: str, subject_data: Dict, legacy: bool = False,
+                           output_format: str = "turtle", single_file: bool = False):
+    """
+    Generate all TTL files for a subject.
+
+    Writes {subject}-subject.ttl, {subject}-knowledge-taxonomy.ttl and
+    {subject}-schemes.ttl, or with single_file=True one {subject}.ttl
+    holding the same content under a single ontology header. Files in the
+    layout not being written are removed.
+    """
 
     subject_dir = f"{SUBJECTS_DIR}/{subject}"
     subject_title = subject.replace('-', ' ').title()
@@ -547,57 +985,44 @@ def generate_subject_files(subject: str, subject_data: Dict):
         print(f"   ⚠️  No data found for {subject_title}, skipping")
         return
 
-    # 1. Subject file
-    subject_graph = create_graph()
-    add_ontology_header(
-        subject_graph,
-        f"https://w3id.org/uk/curriculum/england/{subject}-subject",
-        f"National Curriculum for England - {subject_title} Subject",
-        f"{subject_title} subject definition, including aims and strands."
-    )
-
-    if subject_data.get('subjects'):
-        convert_subjects(subject_data['subjects'], subject_graph)
-    if subject_data.get('subsubjects'):
-        convert_subsubjects(subject_data['subsubjects'], subject_graph)
-
-    write_ttl_file(subject_graph, f"{subject_dir}/{subject}-subject.ttl")
-
-    # 2. Knowledge taxonomy file
-    taxonomy_graph = create_graph()
-    add_ontology_header(
-        taxonomy_graph,
-        f"https://w3id.org/uk/curriculum/england/{subject}-knowledge-taxonomy",
-        f"National Curriculum for England - {subject_title} Knowledge Taxonomy",
-        f"{subject_title} knowledge taxonomy from disciplines to content descriptors."
-    )
-
-    if subject_data.get('disciplines'):
-        convert_disciplines(subject_data['disciplines'], taxonomy_graph)
-    if subject_data.get('strands'):
-        convert_strands(subject_data['strands'], taxonomy_graph)
-    if subject_data.get('substrands'):
-        convert_substrands(subject_data['substrands'], taxonomy_graph)
-    if subject_data.get('contentDescriptors'):
-        convert_content_descriptors(subject_data['contentDescriptors'], taxonomy_graph)
-    if subject_data.get('contentSubdescriptors'):
-        convert_content_subdescriptors(subject_data['contentSubdescriptors'], taxonomy_graph)
-
-    write_ttl_file(taxonomy_graph, f"{subject_dir}/{subject}-knowledge-taxonomy.ttl")
-
-    # 3. Schemes file
-    schemes_graph = create_graph()
-    add_ontology_header(
-        schemes_graph,
-        f"https://w3id.org/uk/curriculum/england/{subject}-schemes",
-        f"National Curriculum for England - {subject_title} Schemes",
-        f"{subject_title} schemes mapping content to key stages."
-    )
-
-    if subject_data.get('schemes'):
-        convert_schemes(subject_data['schemes'], schemes_graph)
-
-    write_ttl_file(schemes_graph, f"{subject_dir}/{subject}-schemes.ttl")
+    single_stem = f"{subject_dir}/{subject}"
+    split_stems = [f"{subject_dir}/{subject}-{name}" for name, *_ in SUBJECT_FILES]
+
+    if single_file:
+        files = [(
+            f"{single_stem}.ttl",
+            f"https://w3id.org/uk/curriculum/england/{subject}",
+            f"National Curriculum for England - {subject_title}",
+            f"{subject_title} subject definition, knowledge taxonomy and schemes.",
+            [converter for *_, converters in SUBJECT_FILES for converter in converters]
+        )]
+    else:
+        files = [(
+            f"{subject_dir}/{subject}-{name}.ttl",
+            f"https://w3id.org/uk/curriculum/england/{subject}-{name}",
+            f"National Curriculum for England - {subject_title} {label}",
+            description.format(title=subject_title),
+            converters
+        ) for name, label, description, converters in SUBJECT_FILES]
+
+    # Only --legacy hands finished files to background writer threads
+    with (FileWriterPool() if legacy else nullcontext()) as io_pool:
+        for filepath, uri, title, description, converters in files:
+            with open_ttl_file(filepath, legacy, output_format, io_pool) as writer:
+                add_ontology_header(writer, uri, title, description)
+
+                for key, convert in converters:
+                    if subject_data.get(key):
+                        convert(subject_data[key], writer)
+
+    # Remove the other layout's files left by an earlier run; merge_ttls.py
+    # picks up every .ttl file, so they would duplicate these triples
+    for stem in (split_stems if single_file else [single_stem]):
+        for extension in ('.ttl', '.nt', '.jelly'):
+            stale_path = stem + extension
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
+                print(f"🗑  Removed: {stale_path}")
 
     # Print summary
     print(f"      ✓ {counts['subjects']} subjects, {counts['disciplines']} disciplines, "
@@ -605,14 +1030,77 @@ def generate_subject_files(subject: str, subject_data: Dict):
           f"{counts['schemes']} schemes")
 
 
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Convert Sanity CMS data to TTL files")
+    parser.add_argument(
+        "--api",
+        action="store_true",
+        help="Fetch data from Sanity API (requires credentials)"
+    )
+    parser.add_argument(
+        "--sample",
+        action="store_true",
+        help="Use sample JSON data for testing (default)"
+    )
+    parser.add_argument(
+        "--subjects",
+        default="all",
+        help="Comma-separated list of subjects to update (default: all)"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only fetch documents changed since last run (requires --api)"
+    )
+    parser.add_argument(
+        "--legacy",
+        action="store_true",
+        help="Build rdflib Graphs and write them with rdflib's Turtle serializer"
+    )
+    parser.add_argument(
+        "--format",
+        choices=["turtle", "nt", "jelly"],
+        default="turtle",
+        help="turtle writes .ttl files; nt also writes a .nt file and jelly "
+             "a .jelly file alongside each one (jelly requires pyjelly)"
+    )
+    parser.add_argument(
+        "--single-file",
+        action="store_true",
+        help="Write each subject as one {subject}.ttl instead of separate "
+             "subject, knowledge taxonomy and schemes files"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help="Number of subjects to convert in parallel (default: number of CPUs)"
+    )
+    return parser.parse_args()
+
+
 def main():
     """Main conversion process."""
+    args = parse_arguments()
+
     print("=" * 60)
     print("Sanity CMS → TTL Converter")
     print("=" * 60)
 
     # Determine data source
-    use_api = '--api' in sys.argv
+    use_api = args.api
+    legacy = args.legacy
+    output_format = args.format
+    requested_subjects = {s.strip() for s in args.subjects.split(',') if s.strip()}
+
+    if args.incremental and not use_api:
+        sys.exit("--incremental requires --api")
+
+    if output_format == "jelly":
+        try:
+            plugin.get("jelly", Serializer)
+        except plugin.PluginException:
+            sys.exit("--format jelly requires pyjelly: pip install 'pyjelly[rdflib]'")
 
     # Load data
     print("\n📥 Loading data...")
@@ -625,46 +1113,48 @@ def main():
 
     print(f"   ✓ Loaded {sum(len(v) if isinstance(v, list) else 0 for v in data.values())} documents")
 
-    # Create graphs for different files
-    print("\n🔄 Converting to RDF...")
+    preprocess(data)
 
-    # 1. Programme Structure
-    print("\n   Converting programme structure...")
-    prog_graph = create_graph()
-    add_ontology_header(
-        prog_graph,
-        "https://w3id.org/uk/curriculum/england/programme-structure",
-        "National Curriculum for England - Programme Structure",
-        "Programme structure defining phases, key stages, and year groups."
-    )
+    # Write the different files
+    print("\n🔄 Converting to RDF...")
 
-    if 'phases' in data:
-        convert_phases(data['phases'], prog_graph)
-    if 'keyStages' in data:
-        convert_key_stages(data['keyStages'], prog_graph)
-    if 'yearGroups' in data:
-        # Year groups conversion (similar to key stages)
-        pass
-
-    write_ttl_file(prog_graph, f"{OUTPUT_DIR}/programme-structure.ttl")
-
-    # 2. Themes
-    if 'themes' in data and data['themes']:
-        print("\n   Converting themes...")
-        themes_graph = create_graph()
-        add_ontology_header(
-            themes_graph,
-            "https://w3id.org/uk/curriculum/england/themes",
-            "National Curriculum for England - Themes",
-            "Cross-cutting themes spanning multiple subjects."
-        )
-
-        # Add the themes concept scheme
-        themes_graph.add((ENG['themes-scheme'], RDF.type, SKOS.ConceptScheme))
-        themes_graph.add((ENG['themes-scheme'], SKOS.prefLabel, Literal("Cross-Cutting Themes", lang="en")))
-
-        convert_themes(data['themes'], themes_graph)
-        write_ttl_file(themes_graph, f"{OUTPUT_DIR}/themes.ttl")
+    with (FileWriterPool() if legacy else nullcontext()) as io_pool:
+        # 1. Programme Structure
+        print("\n   Converting programme structure...")
+        with open_ttl_file(f"{OUTPUT_DIR}/programme-structure.ttl", legacy, output_format, io_pool) as writer:
+            add_ontology_header(
+                writer,
+                "https://w3id.org/uk/curriculum/england/programme-structure",
+                "National Curriculum for England - Programme Structure",
+                "Programme structure defining phases, key stages, and year groups."
+            )
+
+            if 'phases' in data:
+                convert_phases(data['phases'], writer)
+            if 'keyStages' in data:
+                convert_key_stages(data['keyStages'], writer)
+            if 'yearGroups' in data:
+                # Year groups conversion (similar to key stages)
+                pass
+
+        # 2. Themes
+        if 'themes' in data and data['themes']:
+            print("\n   Converting themes...")
+            with open_ttl_file(f"{OUTPUT_DIR}/themes.ttl", legacy, output_format, io_pool) as writer:
+                add_ontology_header(
+                    writer,
+                    "https://w3id.org/uk/curriculum/england/themes",
+                    "National Curriculum for England - Themes",
+                    "Cross-cutting themes spanning multiple subjects."
+                )
+
+                # Add the themes concept scheme
+                writer.emit(THEMES_SCHEME, [
+                    (RDF.type, SKOS.ConceptScheme),
+                    (SKOS.prefLabel, literal_en("Cross-Cutting Themes")),
+                ])
+
+                convert_themes(data['themes'], writer)
 
     # 3. Discover and process all subjects dynamically
     print("\n🔍 Discovering subjects...")
@@ -675,13 +1165,32 @@ def main():
     else:
         print(f"   Found subjects: {', '.join(subjects)}")
 
-        print("\n📚 Processing subjects...")
-        for subject in subjects:
-            # Get data for this subject only
-            subject_data = get_subject_data(data, subject)
+    # Only regenerate the requested subjects' files
+    if 'all' not in requested_subjects:
+        missing = sorted(requested_subjects.difference(subjects))
+        if missing:
+            print(f"   ⚠️  Requested subjects not found in data: {', '.join(missing)}")
+        subjects = [subject for subject in subjects if subject in requested_subjects]
+        print(f"   Updating subjects: {', '.join(subjects) or '(none)'}")
 
-            # Generate all files for this subject
-            generate_subject_files(subject, subject_data)
+    if subjects:
+        print("\n📚 Processing subjects...")
+        indexes = build_indexes(data)
+
+        # Get data for each subject only
+        subject_datas = [get_subject_data(data, subject, indexes) for subject in subjects]
+
+        # Generate all files for each subject, one worker process per subject
+        jobs = min(args.jobs or os.cpu_count() or 1, len(subjects))
+        if jobs > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                list(executor.map(generate_subject_files, subjects, subject_datas,
+                                  repeat(legacy), repeat(output_format),
+                                  repeat(args.single_file)))
+        else:
+            for subject, subject_data in zip(subjects, subject_datas):
+                generate_subject_files(subject, subject_data, legacy, output_format,
+                                       args.single_file)
 
     print("\n" + "=" * 60)
     print("✅ Conversion complete!")
@@ -9,22 +9,51 @@ Key improvements:
 - Handles any number of subjects
 """
 
-import json
 import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Set
+from itertools import chain
+from typing import Dict, List, Set, Tuple
 from rdflib import Graph, Namespace, Literal, URIRef
 from rdflib.namespace import RDF, RDFS, OWL, SKOS, DCTERMS, XSD
 
+# Conversion functions from the main script
+from sanity_to_ttl import (
+    SUBJECT_ID_RE, open_ttl_file, add_ontology_header,
+    convert_subjects, convert_subsubjects,
+    convert_disciplines, convert_strands, convert_substrands,
+    convert_content_descriptors, convert_content_subdescriptors,
+    convert_schemes
+)
+
+# Faster JSON decoding with orjson when installed, as in sanity_to_ttl.py
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 # Configuration
 OUTPUT_DIR = "data/national-curriculum-for-england"
 SUBJECTS_DIR = f"{OUTPUT_DIR}/subjects"
 
+# Document lists that are split per subject
+SUBJECT_DATA_KEYS = (
+    'subjects', 'subsubjects', 'disciplines', 'strands', 'substrands',
+    'contentDescriptors', 'contentSubdescriptors', 'schemes',
+)
+
+# Shared default for documents without a given reference field
+EMPTY_REF = {}
+
 # Namespaces
 CURRIC = Namespace("https://w3id.org/uk/curriculum/core/")
 ENG = Namespace("https://w3id.org/uk/curriculum/england/")
 DC = Namespace("http://purl.org/dc/elements/1.1/")
 
+# Subject names inferred from document IDs, matched case-insensitively
+# (the 'maths' alias in SUBJECT_ID_RE is not used here)
+KNOWN_SUBJECTS = frozenset({'science', 'history', 'mathematics', 'english', 'geography'})
+
 
 def discover_subjects(data: Dict) -> Set[str]:
     """
@@ -49,106 +78,81 @@ def discover_subjects(data: Dict) -> Set[str]:
                 subjects.add(subject_id)
 
     # Infer from document IDs (backup method)
-    all_docs = []
-    for key, docs in data.items():
-        if isinstance(docs, list):
-            all_docs.extend(docs)
+    all_docs = chain.from_iterable(docs for docs in data.values() if isinstance(docs, list))
 
     for doc in all_docs:
         doc_id = doc.get('_id', '')
         # Common patterns: "subject-science", "scheme-mathematics-ks3", etc.
-        for known_subject in ['science', 'history', 'mathematics', 'english', 'geography']:
-            if known_subject in doc_id.lower():
-                subjects.add(known_subject)
+        matches = [name for name in SUBJECT_ID_RE.findall(doc_id.lower()) if name in KNOWN_SUBJECTS]
+        if matches:
+            subjects.update(matches)
+            # Nothing more can be inferred once every known subject is found
+            if subjects >= KNOWN_SUBJECTS:
+                break
 
     return subjects
 
 
-def get_subject_data(data: Dict, subject: str) -> Dict:
+def get_ref(doc: Dict, field: str) -> str:
+    """Return the ID referenced by doc[field], or '' if there is none."""
+    return doc.get(field, EMPTY_REF).get('_ref', '')
+
+
+def bucket_subject_data(data: Dict, subjects: Set[str]) -> Dict[str, Dict]:
     """
-    Filter data to only include documents for the specified subject.
+    Split data into the filtered data of every subject in one pass.
+
+    Follows the reference chains from each subject (subject -> disciplines
+    -> strands -> substrands -> descriptors -> subdescriptors, and
+    subject -> subsubjects -> schemes), walking each document list once and
+    looking up the subjects that own a document from the subjects owning
+    the parent it references.
 
     Args:
         data: All Sanity data
-        subject: Subject ID (e.g., 'science', 'mathematics')
+        subjects: Subject IDs to collect data for
 
     Returns:
-        Filtered data containing only this subject's documents
+        Filtered data for each subject, keyed by subject ID
     """
-    subject_data = {}
-
-    # Filter subjects
-    subject_data['subjects'] = [
-        s for s in data.get('subjects', [])
-        if s.get('_id', '').replace('subject-', '') == subject
-    ]
-
-    # Filter subsubjects
-    subject_data['subsubjects'] = [
-        ss for ss in data.get('subsubjects', [])
-        if ss.get('subject', {}).get('_ref', '').replace('subject-', '') == subject
-    ]
-
-    # Get discipline IDs for this subject
-    discipline_ids = set()
-    for subj in subject_data['subjects']:
-        for disc_ref in subj.get('disciplines', []):
-            discipline_ids.add(disc_ref.get('_ref', ''))
-
-    # Filter disciplines
-    subject_data['disciplines'] = [
-        d for d in data.get('disciplines', [])
-        if d.get('_id', '') in discipline_ids
-    ]
-
-    # Get strand IDs for these disciplines
-    strand_ids = set()
-    for discipline in subject_data['disciplines']:
-        # Find strands that reference this discipline
-        for strand in data.get('strands', []):
-            if strand.get('discipline', {}).get('_ref', '') == discipline['_id']:
-                strand_ids.add(strand['_id'])
-
-    # Filter strands
-    subject_data['strands'] = [
-        s for s in data.get('strands', [])
-        if s.get('_id', '') in strand_ids
-    ]
-
-    # Get substrand IDs for these strands
-    substrand_ids = set()
-    for strand in subject_data['strands']:
-        for substrand in data.get('substrands', []):
-            if substrand.get('strand', {}).get('_ref', '') == strand['_id']:
-                substrand_ids.add(substrand['_id'])
-
-    # Filter substrands
-    subject_data['substrands'] = [
-        ss for ss in data.get('substrands', [])
-        if ss.get('_id', '') in substrand_ids
-    ]
-
-    # Filter content descriptors
-    subject_data['contentDescriptors'] = [
-        cd for cd in data.get('contentDescriptors', [])
-        if cd.get('substrand', {}).get('_ref', '') in substrand_ids
-    ]
-
-    # Get content descriptor IDs
-    descriptor_ids = set(cd['_id'] for cd in subject_data['contentDescriptors'])
-
-    # Filter content subdescriptors
-    subject_data['contentSubdescriptors'] = [
-        csd for csd in data.get('contentSubdescriptors', [])
-        if csd.get('contentDescriptor', {}).get('_ref', '') in descriptor_ids
-    ]
-
-    # Filter schemes (by subsubject reference)
-    subsubject_ids = set(ss['_id'] for ss in subject_data['subsubjects'])
-    subject_data['schemes'] = [
-        sch for sch in data.get('schemes', [])
-        if sch.get('subsubject', {}).get('_ref', '') in subsubject_ids
-    ]
+    subject_data = {subject: {key: [] for key in SUBJECT_DATA_KEYS} for subject in subjects}
+
+    def subject_owner(subject_id: str) -> Tuple[str, ...]:
+        subject = subject_id.replace('subject-', '')
+        return (subject,) if subject in subject_data else ()
+
+    def owned_by(owners_by_id: Dict[str, Set[str]], field: str):
+        return lambda doc: owners_by_id.get(get_ref(doc, field), ())
+
+    def assign(key: str, owners_of) -> Dict[str, Set[str]]:
+        """Add each data[key] document to the data of the subjects owning it
+        and map the IDs of the added documents to those subjects."""
+        docs_by_subject = {subject: filtered[key] for subject, filtered in subject_data.items()}
+        owners_by_id = {}
+        for doc in data.get(key, []):
+            owners = owners_of(doc)
+            if owners:
+                for subject in owners:
+                    docs_by_subject[subject].append(doc)
+                owners_by_id.setdefault(doc['_id'], set()).update(owners)
+        return owners_by_id
+
+    assign('subjects', lambda doc: subject_owner(doc.get('_id', '')))
+    subsubject_owners = assign('subsubjects', lambda doc: subject_owner(get_ref(doc, 'subject')))
+
+    # Disciplines are referenced from the subject rather than the other way round
+    subjects_by_discipline = {}
+    for subject, filtered in subject_data.items():
+        for subj in filtered['subjects']:
+            for disc_ref in subj.get('disciplines', []):
+                subjects_by_discipline.setdefault(disc_ref.get('_ref', ''), set()).add(subject)
+
+    discipline_owners = assign('disciplines', lambda doc: subjects_by_discipline.get(doc.get('_id', ''), ()))
+    strand_owners = assign('strands', owned_by(discipline_owners, 'discipline'))
+    substrand_owners = assign('substrands', owned_by(strand_owners, 'strand'))
+    descriptor_owners = assign('contentDescriptors', owned_by(substrand_owners, 'substrand'))
+    assign('contentSubdescriptors', owned_by(descriptor_owners, 'contentDescriptor'))
+    assign('schemes', owned_by(subsubject_owners, 'subsubject'))
 
     return subject_data
 
@@ -170,67 +174,51 @@ def generate_subject_files(subject: str, subject_data: Dict):
 
     print(f"\n   Generating {subject} files...")
 
-    # Import conversion functions from main script
-    # (In practice, these would be imported from sanity_to_ttl.py)
-    from sanity_to_ttl import (
-        create_graph, add_ontology_header, write_ttl_file,
-        convert_subjects, convert_subsubjects,
-        convert_disciplines, convert_strands, convert_substrands,
-        convert_content_descriptors, convert_content_subdescriptors,
-        convert_schemes
-    )
-
     # 1. Subject file
-    subject_graph = create_graph()
-    add_ontology_header(
-        subject_graph,
-        f"https://w3id.org/uk/curriculum/england/{subject}-subject",
-        f"National Curriculum for England - {subject.title()} Subject",
-        f"{subject.title()} subject definition, including aims and strands."
-    )
-
-    if subject_data.get('subjects'):
-        convert_subjects(subject_data['subjects'], subject_graph)
-    if subject_data.get('subsubjects'):
-        convert_subsubjects(subject_data['subsubjects'], subject_graph)
-
-    write_ttl_file(subject_graph, f"{subject_dir}/{subject}-subject.ttl")
+    with open_ttl_file(f"{subject_dir}/{subject}-subject.ttl") as writer:
+        add_ontology_header(
+            writer,
+            f"https://w3id.org/uk/curriculum/england/{subject}-subject",
+            f"National Curriculum for England - {subject.title()} Subject",
+            f"{subject.title()} subject definition, including aims and strands."
+        )
+
+        if subject_data.get('subjects'):
+            convert_subjects(subject_data['subjects'], writer)
+        if subject_data.get('subsubjects'):
+            convert_subsubjects(subject_data['subsubjects'], writer)
 
     # 2. Knowledge taxonomy file
-    taxonomy_graph = create_graph()
-    add_ontology_header(
-        taxonomy_graph,
-        f"https://w3id.org/uk/curriculum/england/{subject}-knowledge-taxonomy",
-        f"National Curriculum for England - {subject.title()} Knowledge Taxonomy",
-        f"{subject.title()} knowledge taxonomy from disciplines to content descriptors."
-    )
-
-    if subject_data.get('disciplines'):
-        convert_disciplines(subject_data['disciplines'], taxonomy_graph)
-    if subject_data.get('strands'):
-        convert_strands(subject_data['strands'], taxonomy_graph)
-    if subject_data.get('substrands'):
-        convert_substrands(subject_data['substrands'], taxonomy_graph)
-    if subject_data.get('contentDescriptors'):
-        convert_content_descriptors(subject_data['contentDescriptors'], taxonomy_graph)
-    if subject_data.get('contentSubdescriptors'):
-        convert_content_subdescriptors(subject_data['contentSubdescriptors'], taxonomy_graph)
-
-    write_ttl_file(taxonomy_graph, f"{subject_dir}/{subject}-knowledge-taxonomy.ttl")
+    with open_ttl_file(f"{subject_dir}/{subject}-knowledge-taxonomy.ttl") as writer:
+        add_ontology_header(
+            writer,
+            f"https://w3id.org/uk/curriculum/england/{subject}-knowledge-taxonomy",
+            f"National Curriculum for England - {subject.title()} Knowledge Taxonomy",
+            f"{subject.title()} knowledge taxonomy from disciplines to content descriptors."
+        )
+
+        if subject_data.get('disciplines'):
+            convert_disciplines(subject_data['disciplines'], writer)
+        if subject_data.get('strands'):
+            convert_strands(subject_data['strands'], writer)
+        if subject_data.get('substrands'):
+            convert_substrands(subject_data['substrands'], writer)
+        if subject_data.get('contentDescriptors'):
+            convert_content_descriptors(subject_data['contentDescriptors'], writer)
+        if subject_data.get('contentSubdescriptors'):
+            convert_content_subdescriptors(subject_data['contentSubdescriptors'], writer)
 
     # 3. Schemes file
-    schemes_graph = create_graph()
-    add_ontology_header(
-        schemes_graph,
-        f"https://w3id.org/uk/curriculum/england/{subject}-schemes",
-        f"National Curriculum for England - {subject.title()} Schemes",
-        f"{subject.title()} schemes mapping content to key stages."
-    )
-
-    if subject_data.get('schemes'):
-        convert_schemes(subject_data['schemes'], schemes_graph)
+    with open_ttl_file(f"{subject_dir}/{subject}-schemes.ttl") as writer:
+        add_ontology_header(
+            writer,
+            f"https://w3id.org/uk/curriculum/england/{subject}-schemes",
+            f"National Curriculum for England - {subject.title()} Schemes",
+            f"{subject.title()} schemes mapping content to key stages."
+        )
 
-    write_ttl_file(schemes_graph, f"{subject_dir}/{subject}-schemes.ttl")
+        if subject_data.get('schemes'):
+            convert_schemes(subject_data['schemes'], writer)
 
     # Count what was generated
     counts = {
@@ -254,8 +242,8 @@ def main():
     print("=" * 60)
 
     # Load data (simplified - would use load_sample_data() or fetch_from_sanity_api())
-    with open('sanity-sample-data/sample-data.json', 'r') as f:
-        data = json.load(f)
+    with open('sanity-sample-data/sample-data.json', 'rb') as f:
+        data = json_loads(f.read())
 
     # 1. Process programme structure (subject-agnostic)
     print("\n📋 Processing programme structure...")
@@ -278,14 +266,19 @@ def main():
     # 4. Process each subject
     print("\n📚 Processing subjects...")
 
-    for subject in sorted(subjects):
-        print(f"\n   Processing: {subject}")
-
-        # Get data for this subject only
-        subject_data = get_subject_data(data, subject)
-
-        # Generate files
-        generate_subject_files(subject, subject_data)
+    # Split the data between subjects in a single pass
+    data_by_subject = bucket_subject_data(data, subjects)
+
+    # Generate files for each subject, one worker process per subject
+    ordered = sorted(subjects)
+    jobs = min(os.cpu_count() or 1, len(ordered))
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            list(executor.map(generate_subject_files, ordered,
+                              [data_by_subject[subject] for subject in ordered]))
+    else:
+        for subject in ordered:
+            generate_subject_files(subject, data_by_subject[subject])
 
     print("\n" + "=" * 60)
     print("✅ All subjects processed!")
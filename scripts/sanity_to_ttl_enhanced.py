@@ -9,14 +9,32 @@ This version adds:
 - Dependency awareness
 """
 
-import json
 import os
+import pickle
 import argparse
+from contextlib import suppress
 from datetime import datetime, timezone
 from typing import Dict, List, Any, Optional, Set
 from rdflib import Graph, Namespace, Literal, URIRef
 from rdflib.namespace import RDF, RDFS, OWL, SKOS, DCTERMS, XSD
 
+from sanity_to_ttl import subjects_in_id
+
+# Stream the sample data with ijson when it is installed (pip install ijson),
+# so subjects outside the update scope are dropped as they are read instead
+# of after the whole file has been loaded.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Without ijson, decode the sample file with orjson if available (it is in
+# the 'fast' extra), otherwise the standard json module
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 # Configuration
 TIMESTAMP_FILE = "scripts/.last-run-timestamp"
 OUTPUT_DIR = "data/national-curriculum-for-england"
@@ -27,6 +45,10 @@ CURRIC = Namespace("https://w3id.org/uk/curriculum/core/")
 ENG = Namespace("https://w3id.org/uk/curriculum/england/")
 DC = Namespace("http://purl.org/dc/elements/1.1/")
 
+# Subjects recognised from document IDs, in order of precedence when an
+# ID names more than one
+ID_SUBJECTS = ('science', 'history', 'mathematics')
+
 
 class UpdateScope:
     """Manages what needs to be updated based on filters and dependencies."""
@@ -51,12 +73,13 @@ class UpdateScope:
 
         # Determine which subject(s) this affects
         # This is a simplified version - you'd extract from the actual document
-        if 'science' in doc_id:
+        id_subjects = subjects_in_id(doc_id)
+        if 'science' in id_subjects:
             self.affected_subjects.add('science')
-        elif 'history' in doc_id:
+        elif 'history' in id_subjects:
             self.affected_subjects.add('history')
         # Programme structure affects everything
-        elif doc_type in ['phase', 'keyStage', 'yearGroup']:
+        elif doc_type in ('phase', 'keyStage', 'yearGroup'):
             self.affected_subjects.add('_programme_structure')
 
 
@@ -161,15 +184,51 @@ def fetch_from_sanity_api(scope: UpdateScope) -> Dict:
     raise NotImplementedError("API fetching not yet implemented. Use --sample flag.")
 
 
-def load_sample_data(scope: UpdateScope) -> Dict:
-    """Load sample JSON data with scope filtering applied."""
-    sample_file = "sanity-sample-data/sample-data.json"
+def stream_sample_data(f, scope: UpdateScope) -> Dict:
+    """
+    Load sample JSON data with ijson, one document at a time.
 
-    if not os.path.exists(sample_file):
-        raise FileNotFoundError(f"Sample data file not found: {sample_file}")
+    Each item of a top-level array is built on its own, and subjects the
+    scope does not update are discarded as soon as they are complete.
+    Gives the same result as load_sample_data without ijson.
+    """
+    data = {}
+    key = builder = None
+
+    for prefix, event, value in ijson.parse(f, use_float=True):
+        if builder is None:
+            if prefix == '':
+                if event == 'map_key':
+                    key = value
+                continue
+            if prefix == key and event in ('start_array', 'end_array'):
+                if event == 'start_array':
+                    data[key] = []
+                continue
+            # Start of an array item, or of a top-level value that is not an array
+            builder = ijson.ObjectBuilder()
+            value_prefix = prefix
+
+        builder.event(event, value)
+        if prefix != value_prefix or event in ('start_map', 'start_array', 'map_key'):
+            continue
+
+        doc = builder.value
+        builder = None
+        if value_prefix == key:
+            data[key] = doc
+        elif key != 'subjects' or scope.should_update_subject(doc['_id']):
+            data[key].append(doc)
+
+    return data
 
-    with open(sample_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+
+def read_sample_data(sample_file: str, scope: UpdateScope) -> Dict:
+    """Parse the sample JSON file and apply scope filtering."""
+    with open(sample_file, 'rb') as f:
+        if ijson is not None:
+            return stream_sample_data(f, scope)
+        data = json_loads(f.read())
 
     # Apply subject filtering to sample data
     if 'all' not in scope.subjects:
@@ -185,17 +244,59 @@ def load_sample_data(scope: UpdateScope) -> Dict:
     return data
 
 
+def load_sample_data(scope: UpdateScope, write_cache: bool = True) -> Dict:
+    """
+    Load sample JSON data with scope filtering applied.
+
+    The result is pickled to {sample_file}.cache and reused on later runs
+    while the sample file's mtime and size and the subject filter are
+    unchanged, so the JSON is only parsed again after it is edited.
+    Pass write_cache=False to leave the cache file untouched (e.g. for
+    --dry-run); failing to write it never stops the data from loading.
+    """
+    sample_file = "sanity-sample-data/sample-data.json"
+
+    if not os.path.exists(sample_file):
+        raise FileNotFoundError(f"Sample data file not found: {sample_file}")
+
+    stat = os.stat(sample_file)
+    cache_file = f"{sample_file}.cache"
+    cache_key = f"{stat.st_mtime_ns}:{stat.st_size}:{','.join(scope.subjects)}\n".encode('utf-8')
+
+    try:
+        with open(cache_file, 'rb') as f:
+            if f.readline() == cache_key:
+                return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        pass
+
+    data = read_sample_data(sample_file, scope)
+    if not write_cache:
+        return data
+
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_file, 'wb') as f:
+            f.write(cache_key)
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"⚠️  Could not write sample data cache {cache_file}: {e}")
+        with suppress(OSError):
+            os.remove(tmp_file)
+
+    return data
+
+
 def get_subject_name_from_doc(doc: Dict) -> Optional[str]:
     """Extract subject name from a document."""
     doc_id = doc.get('_id', '')
 
     # Try to extract subject from ID
-    if 'science' in doc_id:
-        return 'science'
-    elif 'history' in doc_id:
-        return 'history'
-    elif 'mathematics' in doc_id or 'maths' in doc_id:
-        return 'mathematics'
+    id_subjects = subjects_in_id(doc_id)
+    for subject in ID_SUBJECTS:
+        if subject in id_subjects:
+            return subject
 
     # For subjects themselves
     if doc.get('_type') == 'subject':
@@ -331,7 +432,7 @@ def main():
         if use_api:
             data = fetch_from_sanity_api(scope)
         else:
-            data = load_sample_data(scope)
+            data = load_sample_data(scope, write_cache=not args.dry_run)
     except Exception as e:
         print(f"\n❌ Error loading data: {e}")
         return 1
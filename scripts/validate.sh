@@ -29,13 +29,28 @@ else
     exit 1
 fi
 
-$PYSHACL \
-  --shacl ontology/dfe-curriculum-constraints.ttl \
-  --ont-graph ontology/dfe-curriculum-ontology.ttl \
-  --inference rdfs \
-  --abort \
-  --format human \
-  /tmp/combined-data.ttl
+# Skip validation if the merged data, shapes, ontology and pyshacl version
+# are identical to the last run that passed (delete the stamp to force a run)
+VALIDATION_STAMP="scripts/.last-validation-stamp"
+STAMP=$( { $PYSHACL --version; cat /tmp/combined-data.ttl \
+  ontology/dfe-curriculum-constraints.ttl \
+  ontology/dfe-curriculum-ontology.ttl; } | python3 -c \
+  "import hashlib, sys; print(hashlib.sha256(sys.stdin.buffer.read()).hexdigest())")
+
+if [ -f "$VALIDATION_STAMP" ] && [ "$(cat "$VALIDATION_STAMP")" = "$STAMP" ]; then
+  echo "⏭  Unchanged since last successful validation, skipping pyshacl"
+  echo "   (delete $VALIDATION_STAMP to force a full run)"
+else
+  rm -f "$VALIDATION_STAMP"
+  $PYSHACL \
+    --shacl ontology/dfe-curriculum-constraints.ttl \
+    --ont-graph ontology/dfe-curriculum-ontology.ttl \
+    --inference rdfs \
+    --abort \
+    --format human \
+    /tmp/combined-data.ttl
+  echo "$STAMP" > "$VALIDATION_STAMP"
+fi
 
 echo ""
 echo "========================================================================"